@@ -1,35 +1,47 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException, File, UploadFile, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+import hashlib
 import pandas as pd
-import io
 from typing import List, Dict, Any
 import logging
 
 from api.schemas import (
     LoanInput, PredictionResponse, ExplanationResponse, 
-    RecommendationResponse, BatchPredictionRequest, BatchPredictionResponse,
-    TemplateResponse
+    RecommendationResponse, FullAnalysisResponse, BatchPredictionRequest,
+    BatchPredictionResponse, TemplateResponse
 )
 from core.predictor import predictor
 from core.explainer import explainer
 from core.recommender import recommender
-from core.utils import validate_loan_input, create_template_csv, get_sample_data, log_request, log_response, handle_api_error
+from core.batcher import AsyncBatcher
+from core.utils import SCHEMA_DTYPES, validate_loan_dataframe, create_template_csv_bytes, iter_csv_chunks, get_sample_data, log_request, log_response, handle_api_error
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Micro-batch concurrent single predictions into one model call
+prediction_batcher = AsyncBatcher(predictor.predict_batch)
+explanation_batcher = AsyncBatcher(explainer.explain_batch)
+
+# The template is constant, so its validator headers are computed once
+_TEMPLATE_ETAG = f'"{hashlib.sha1(create_template_csv_bytes()).hexdigest()}"'
+_TEMPLATE_HEADERS = {
+    "ETag": _TEMPLATE_ETAG,
+    "Cache-Control": "public, max-age=86400"
+}
+
 @router.post("/predict", response_model=PredictionResponse)
 async def predict_loan(loan_data: LoanInput):
     """Predict loan approval for single application"""
     try:
-        # Convert to dict and validate
-        data = loan_data.dict()
-        validated_data = validate_loan_input(data)
+        # LoanInput has already validated and normalized the payload
+        validated_data = loan_data.model_dump()
         
         log_request("predict", validated_data)
         
         # Get prediction
-        result = predictor.predict_single(validated_data)
+        result = await prediction_batcher.submit(validated_data)
         
         response = PredictionResponse(
             prediction=result['prediction'],
@@ -37,7 +49,7 @@ async def predict_loan(loan_data: LoanInput):
             confidence=result['confidence']
         )
         
-        log_response("predict", response.dict())
+        log_response("predict", response.model_dump())
         return response
         
     except Exception as e:
@@ -48,16 +60,13 @@ async def predict_loan(loan_data: LoanInput):
 async def predict_batch(batch_request: BatchPredictionRequest):
     """Predict loan approval for batch applications"""
     try:
-        # Validate all inputs
-        validated_data = []
-        for item in batch_request.data:
-            data = item.dict()
-            validated_data.append(validate_loan_input(data))
+        # Every item has already been validated by the LoanInput schema
+        validated_data = [item.model_dump() for item in batch_request.data]
         
         log_request("predict/batch", f"Batch size: {len(validated_data)}")
         
         # Get predictions
-        results = predictor.predict_batch(validated_data)
+        results = await run_in_threadpool(predictor.predict_batch, validated_data)
         
         # Format response
         predictions = [
@@ -82,39 +91,40 @@ async def predict_batch(batch_request: BatchPredictionRequest):
 async def predict_csv(file: UploadFile = File(...)):
     """Predict loan approval from CSV file"""
     try:
-        # Read CSV
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+        # Parse the upload straight from the spooled file; categorical columns
+        # are declared as strings so pandas skips type inference for them
+        df = await run_in_threadpool(
+            pd.read_csv,
+            file.file,
+            skipinitialspace=True,
+            dtype={'education': str, 'self_employed': str}
+        )
         
         # Clean column names
         df.columns = [col.strip() for col in df.columns]
         
-        # Validate and predict
-        results = []
-        for _, row in df.iterrows():
-            try:
-                data = row.to_dict()
-                validated_data = validate_loan_input(data)
-                result = predictor.predict_single(validated_data)
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    'prediction': 'Error',
-                    'probability': 0.0,
-                    'confidence': 'Error',
-                    'error': str(e)
-                })
-        
-        # Create response DataFrame
-        df_results = pd.DataFrame(results)
-        
-        # Return as CSV
-        output = io.StringIO()
-        df_results.to_csv(output, index=False)
-        csv_content = output.getvalue()
+        # Validate all rows at once; invalid rows are reported, not predicted
+        validated_df, errors = await run_in_threadpool(validate_loan_dataframe, df)
+        invalid_rows = errors.notna()
         
-        return Response(
-            content=csv_content,
+        df_results = pd.DataFrame({
+            'prediction': 'Error',
+            'probability': 0.0,
+            'confidence': 'Error',
+            'prediction_proba': None
+        }, index=df.index)
+        
+        if not invalid_rows.all():
+            valid_df = validated_df[~invalid_rows].astype(SCHEMA_DTYPES, copy=False)
+            predictions = await run_in_threadpool(predictor.predict_dataframe, valid_df)
+            df_results.loc[predictions.index, predictions.columns] = predictions
+        
+        if invalid_rows.any():
+            df_results['error'] = errors
+        
+        # Stream the results back as CSV
+        return StreamingResponse(
+            iter_csv_chunks(df_results),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=predictions.csv"}
         )
@@ -127,14 +137,13 @@ async def predict_csv(file: UploadFile = File(...)):
 async def explain_prediction(loan_data: LoanInput):
     """Explain loan prediction using SHAP values"""
     try:
-        # Convert to dict and validate
-        data = loan_data.dict()
-        validated_data = validate_loan_input(data)
+        # LoanInput has already validated and normalized the payload
+        validated_data = loan_data.model_dump()
         
         log_request("explain", validated_data)
         
         # Get explanation
-        result = explainer.explain_prediction(validated_data)
+        result = await explanation_batcher.submit(validated_data)
         
         response = ExplanationResponse(
             prediction=result['prediction'],
@@ -155,14 +164,14 @@ async def explain_prediction(loan_data: LoanInput):
 async def get_recommendations(loan_data: LoanInput):
     """Get recommendations for loan approval improvement"""
     try:
-        # Convert to dict and validate
-        data = loan_data.dict()
-        validated_data = validate_loan_input(data)
+        # LoanInput has already validated and normalized the payload
+        validated_data = loan_data.model_dump()
         
         log_request("recommend", validated_data)
         
-        # Get recommendations
-        result = recommender.generate_recommendations(validated_data)
+        # Get recommendations, reusing the (batched, cached) SHAP explanation
+        explanation = await explanation_batcher.submit(validated_data)
+        result = await run_in_threadpool(recommender.generate_recommendations, validated_data, explanation)
         
         response = RecommendationResponse(
             current_prediction=result['current_prediction'],
@@ -177,17 +186,65 @@ async def get_recommendations(loan_data: LoanInput):
         logger.error(f"Recommendation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/full", response_model=FullAnalysisResponse)
+async def full_analysis(loan_data: LoanInput):
+    """Predict, explain and recommend for a single application in one pass"""
+    try:
+        # LoanInput has already validated and normalized the payload
+        validated_data = loan_data.model_dump()
+        
+        log_request("full", validated_data)
+        
+        # The explanation already carries the prediction; recommendations reuse it too
+        explanation = await explanation_batcher.submit(validated_data)
+        recommendations = await run_in_threadpool(
+            recommender.generate_recommendations, validated_data, explanation
+        )
+        
+        response = FullAnalysisResponse(
+            prediction=PredictionResponse(
+                prediction=explanation['prediction'],
+                probability=explanation['probability'],
+                confidence=predictor.get_confidence_level(explanation['probability'])
+            ),
+            explanation=ExplanationResponse(
+                prediction=explanation['prediction'],
+                probability=explanation['probability'],
+                shap_values=explanation['shap_values'],
+                top_contributing_features=explanation['top_contributing_features'],
+                feature_impact=explanation['feature_impact']
+            ),
+            recommendations=RecommendationResponse(
+                current_prediction=recommendations['current_prediction'],
+                recommendations=recommendations['recommendations'],
+                potential_improvements=recommendations['potential_improvements']
+            )
+        )
+        
+        log_response("full", "Full analysis generated successfully")
+        return response
+        
+    except Exception as e:
+        logger.error(f"Full analysis error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/template")
-async def get_template():
+async def get_template(request: Request):
     """Get CSV template for loan applications"""
     try:
-        # Create template CSV
-        csv_content = create_template_csv()
+        # Clients that already hold this version (or accept any, "*") get an empty 304
+        if_none_match = request.headers.get("if-none-match", "")
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if _TEMPLATE_ETAG in tags or "*" in tags:
+            return Response(status_code=304, headers=_TEMPLATE_HEADERS)
         
         return Response(
-            content=csv_content,
+            content=create_template_csv_bytes(),
             media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=loan_application_template.csv"}
+            headers={
+                **_TEMPLATE_HEADERS,
+                "Content-Disposition": "attachment; filename=loan_application_template.csv"
+            }
         )
         
     except Exception as e:
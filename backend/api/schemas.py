@@ -1,19 +1,38 @@
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Dict, Any, Optional, Literal
+from typing_extensions import Annotated
 import pandas as pd
 
+from core.utils import EDUCATION_VALUES, SELF_EMPLOYED_VALUES, MAX_AMOUNT
+
+# Non-negative, finite amount in rupees that fits the models' float32 inputs
+Amount = Annotated[float, Field(ge=0, le=MAX_AMOUNT, allow_inf_nan=False)]
+
 class LoanInput(BaseModel):
-    no_of_dependents: int
-    education: str  # Accepts both "Graduate"/"Not Graduate" and " Graduate"/" Not Graduate"
-    self_employed: str  # Accepts both "Yes"/"No" and " Yes"/" No"
-    income_annum: float
-    loan_amount: float
-    loan_term: int
-    cibil_score: int
-    residential_assets_value: float
-    commercial_assets_value: float
-    luxury_assets_value: float
-    bank_asset_value: float
+    """Loan application, validated and normalized to the encoder format on parse"""
+    no_of_dependents: Annotated[int, Field(ge=0, le=10)]
+    education: Literal[' Graduate', ' Not Graduate']  # Also accepts "Graduate"/"Not Graduate"
+    self_employed: Literal[' Yes', ' No']  # Also accepts "Yes"/"No"
+    income_annum: Amount
+    loan_amount: Amount
+    loan_term: Annotated[int, Field(ge=1, le=30)]
+    cibil_score: Annotated[int, Field(ge=300, le=900)]
+    residential_assets_value: Amount
+    commercial_assets_value: Amount
+    luxury_assets_value: Amount
+    bank_asset_value: Amount
+
+    @field_validator('education', mode='before')
+    @classmethod
+    def normalize_education(cls, value):
+        """Add the leading space the encoders expect"""
+        return EDUCATION_VALUES.get(value, value) if isinstance(value, str) else value
+
+    @field_validator('self_employed', mode='before')
+    @classmethod
+    def normalize_self_employed(cls, value):
+        """Add the leading space the encoders expect"""
+        return SELF_EMPLOYED_VALUES.get(value, value) if isinstance(value, str) else value
 
 class PredictionResponse(BaseModel):
     prediction: str
@@ -32,6 +51,11 @@ class RecommendationResponse(BaseModel):
     recommendations: List[Dict[str, Any]]
     potential_improvements: Dict[str, float]
 
+class FullAnalysisResponse(BaseModel):
+    prediction: PredictionResponse
+    explanation: ExplanationResponse
+    recommendations: RecommendationResponse
+
 class BatchPredictionRequest(BaseModel):
     data: List[LoanInput]
 
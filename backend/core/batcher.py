@@ -0,0 +1,106 @@
+import asyncio
+import os
+from typing import Any, Callable, List, Optional
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+class AsyncBatcher:
+    """Aggregate concurrent requests into micro-batches for a batch function
+
+    Items submitted while a batch is being collected are grouped until either
+    `max_batch_size` items are queued or `max_latency_ms` has elapsed since the
+    first one arrived, then `process_batch` is called once for the whole group
+    and each caller receives its own result.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]],
+                 max_batch_size: Optional[int] = None, max_latency_ms: Optional[float] = None):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size or int(os.getenv('MAX_BATCH_SIZE', 32))
+        self.max_latency = (max_latency_ms or float(os.getenv('MAX_BATCH_LATENCY_MS', 5))) / 1000
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+    def _ensure_worker(self):
+        """Start the background worker on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result"""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def stop(self):
+        """Cancel the background worker"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    async def _collect_batch(self) -> list:
+        """Wait for the first item, then drain the queue until size or latency limit"""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_latency
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Process batches until cancelled"""
+        while True:
+            batch = await self._collect_batch()
+            items = [item for item, _ in batch]
+
+            try:
+                # Run the CPU-bound batch off the event loop
+                results = await run_in_threadpool(self.process_batch, items)
+            except Exception as e:
+                logger.error(f"Batch processing error: {e}")
+                if len(batch) == 1:
+                    self._set_exception(batch[0][1], e)
+                else:
+                    # Retry item by item so only the offending request fails
+                    await self._run_individually(batch)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _run_individually(self, batch: list):
+        """Process each queued item on its own, failing only the items that raise"""
+        for item, future in batch:
+            try:
+                result = (await run_in_threadpool(self.process_batch, [item]))[0]
+            except Exception as e:
+                self._set_exception(future, e)
+                continue
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _set_exception(future: asyncio.Future, error: Exception):
+        """Fail a caller's future unless it has already been resolved"""
+        if not future.done():
+            future.set_exception(error)
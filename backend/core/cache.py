@@ -0,0 +1,40 @@
+from collections import OrderedDict
+import os
+import threading
+from typing import Any, Dict, Hashable, Optional
+
+def make_cache_key(data: Dict[str, Any], *extra: Hashable) -> tuple:
+    """Build a stable, hashable key from a validated input dict"""
+    return extra + tuple(sorted(data.items()))
+
+class ResultCache:
+    """Thread-safe LRU cache for prediction and explanation results"""
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = maxsize or int(os.getenv('RESULT_CACHE_SIZE', 4096))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -4,90 +4,120 @@ import numpy as np
 from typing import Dict, Any, List
 from core.model_loader import model_loader
 from core.predictor import predictor
+from core.cache import ResultCache, make_cache_key
 import logging
 
 logger = logging.getLogger(__name__)
 
+# For loan approval, we always want to show SHAP values for the "Approved" class (class 0)
+# This shows how each feature contributes to the probability of approval
+# 0 = Approved, 1 = Rejected
+APPROVAL_CLASS = 0
+
 class LoanExplainer:
     def __init__(self):
         self.model_loader = model_loader
         self.predictor = predictor
         self.explainer = None
+        self._extract_shap_matrix = None
+        self.cache = ResultCache()
         self._initialize_explainer()
+        self.model_loader.register_reload_callback(self._initialize_explainer)
+        self.model_loader.register_reload_callback(self.cache.clear)
     
     def _initialize_explainer(self):
         """Initialize SHAP explainer"""
         try:
             model = self.model_loader.get_model('random_forest')
-            self.explainer = self.model_loader.get_model('shap')
+            self.explainer = shap.TreeExplainer(
+                model,
+                feature_perturbation='tree_path_dependent',
+                model_output='raw'
+            )
+            
+            # Warm up on a dummy row so the first request doesn't pay the setup cost;
+            # the output format is fixed per model, so pick its extractor once here
+            feature_names = self.model_loader.get_feature_names()
+            dummy_row = pd.DataFrame(np.zeros((1, len(feature_names))), columns=feature_names)
+            self._extract_shap_matrix = self._select_shap_extractor(self.explainer.shap_values(dummy_row))
+            
             logger.info("SHAP explainer initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing SHAP explainer: {e}")
             raise
     
+    def _select_shap_extractor(self, shap_values):
+        """Choose how to reduce this explainer's SHAP output to (n_samples, n_features)"""
+        if isinstance(shap_values, list):
+            # List format for binary classification
+            return lambda values: values[APPROVAL_CLASS]
+        if np.ndim(shap_values) == 3:
+            # Shape is (n_samples, n_features, n_classes)
+            return lambda values: values[:, :, APPROVAL_CLASS]
+        # Shape is already (n_samples, n_features)
+        return lambda values: values
+    
     def explain_prediction(self, data: Dict[str, Any], model_name: str = 'random_forest') -> Dict[str, Any]:
         """Generate SHAP explanation for a single prediction"""
+        return self.explain_batch([data], model_name)[0]
+    
+    def explain_batch(self, data: List[Dict[str, Any]], model_name: str = 'random_forest') -> List[Dict[str, Any]]:
+        """Generate SHAP explanations for several predictions with one SHAP call"""
+        # Serve repeated inputs from the cache
+        cache_keys = [make_cache_key(item, model_name) for item in data]
+        results = [self.cache.get(key) for key in cache_keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        
+        if misses:
+            explanations = self._compute_explanations([data[i] for i in misses], model_name)
+            for i, explanation in zip(misses, explanations):
+                self.cache.put(cache_keys[i], explanation)
+                results[i] = explanation
+        
+        return [dict(result) for result in results]
+    
+    def _compute_explanations(self, data: List[Dict[str, Any]], model_name: str) -> List[Dict[str, Any]]:
+        """Compute SHAP explanations for data that is not cached"""
         try:
-            # Get prediction first
-            prediction_result = self.predictor.predict_single(data, model_name)
-            
-            # Preprocess data
+            # Preprocess data once and reuse it for prediction and SHAP
             processed_data = self.predictor.preprocess_data(data)
+            prediction_results = self.predictor.predict_preprocessed(processed_data, model_name)
             
             # Get SHAP values
             shap_values = self.explainer.shap_values(processed_data)
-            logger.info(f"SHAP values type: {type(shap_values)}")
-            logger.info(f"SHAP values shape: {shap_values.shape if hasattr(shap_values, 'shape') else 'No shape'}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"SHAP values type: {type(shap_values)}")
+                logger.debug(f"SHAP values shape: {shap_values.shape if hasattr(shap_values, 'shape') else 'No shape'}")
             
-            # For loan approval, we always want to show SHAP values for the "Approved" class (class 0)
-            # This shows how each feature contributes to the probability of approval
-            # 0 = Approved, 1 = Rejected
-            approval_class = 0  # Always use class 0 (Approved) for interpretation
-            
-            # Handle different SHAP value formats
-            if hasattr(shap_values, 'shape'):
-                if len(shap_values.shape) == 3:
-                    # Shape is (n_samples, n_features, n_classes)
-                    # Use the SHAP values for the approval class (class 0)
-                    shap_values_for_prediction = shap_values[0, :, approval_class]
-                elif len(shap_values.shape) == 2:
-                    # Shape is (n_samples, n_features)
-                    shap_values_for_prediction = shap_values[0, :]
-                else:
-                    # Shape is (n_features,)
-                    shap_values_for_prediction = shap_values
-            elif isinstance(shap_values, list) and len(shap_values) == 2:
-                # List format for binary classification
-                shap_values_for_prediction = shap_values[approval_class]
-                if hasattr(shap_values_for_prediction, 'shape') and len(shap_values_for_prediction.shape) > 1:
-                    shap_values_for_prediction = shap_values_for_prediction[0]
-            else:
-                shap_values_for_prediction = shap_values
-                if hasattr(shap_values_for_prediction, 'shape') and len(shap_values_for_prediction.shape) > 1:
-                    shap_values_for_prediction = shap_values_for_prediction[0]
+            # Keep the SHAP values for the approval class only
+            shap_matrix = self._extract_shap_matrix(shap_values)
             
             # Get feature names
             feature_names = self.model_loader.get_feature_names()
             
-            # Create SHAP values dictionary
-            shap_dict = {
-                feature_names[i]: float(shap_values_for_prediction[i]) 
-                for i in range(len(feature_names))
-            }
+            explanations = []
+            for i in range(len(processed_data)):
+                # Create SHAP values dictionary
+                shap_dict = {
+                    feature_names[j]: float(shap_matrix[i, j])
+                    for j in range(len(feature_names))
+                }
+                
+                # Get top contributing features
+                top_features = self._get_top_features(shap_dict, processed_data.iloc[i])
+                
+                # Get feature impact description
+                feature_impact = self._get_feature_impact(shap_dict)
+                
+                explanations.append({
+                    'prediction': prediction_results['prediction'].iloc[i],
+                    'probability': float(prediction_results['probability'].iloc[i]),
+                    'shap_values': shap_dict,
+                    'top_contributing_features': top_features,
+                    'feature_impact': feature_impact
+                })
             
-            # Get top contributing features
-            top_features = self._get_top_features(shap_dict, processed_data.iloc[0])
-            
-            # Get feature impact description
-            feature_impact = self._get_feature_impact(shap_dict)
-            
-            return {
-                'prediction': prediction_result['prediction'],
-                'probability': prediction_result['probability'],
-                'shap_values': shap_dict,
-                'top_contributing_features': top_features,
-                'feature_impact': feature_impact
-            }
+            return explanations
             
         except Exception as e:
             logger.error(f"SHAP explanation error: {e}")
@@ -95,18 +125,30 @@ class LoanExplainer:
     
     def _get_top_features(self, shap_values: Dict[str, float], data_row: pd.Series, top_n: int = 5) -> List[Dict[str, Any]]:
         """Get top contributing features"""
-        # Sort by absolute SHAP value
-        sorted_features = sorted(shap_values.items(), key=lambda x: abs(x[1]), reverse=True)
+        feature_names = list(shap_values)
+        values = np.fromiter(shap_values.values(), dtype=np.float64, count=len(feature_names))
+        importances = np.abs(values)
+        
+        # Find the top_n-th largest importance, then rank only the features at
+        # or above it; ties keep feature order, as with a stable sort
+        top_n = min(top_n, len(feature_names))
+        if top_n == 0:
+            return []
+        cutoff = importances[np.argpartition(-importances, top_n - 1)[top_n - 1]]
+        candidates = np.flatnonzero(importances >= cutoff)
+        top_indices = candidates[np.argsort(-importances[candidates], kind='stable')[:top_n]]
         
         top_features = []
-        for i, (feature, shap_val) in enumerate(sorted_features[:top_n]):
+        for rank, i in enumerate(top_indices, start=1):
+            feature = feature_names[i]
+            shap_val = float(values[i])
             top_features.append({
-                'rank': i + 1,
+                'rank': rank,
                 'feature': feature,
                 'shap_value': shap_val,
                 'feature_value': float(data_row[feature]),
                 'impact': 'Positive' if shap_val > 0 else 'Negative',
-                'importance': abs(shap_val)
+                'importance': float(importances[i])
             })
         
         return top_features
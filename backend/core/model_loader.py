@@ -1,21 +1,36 @@
 import joblib
+import os
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import logging
 
+from core.onnx_model import load_onnx_model
+
 logger = logging.getLogger(__name__)
 
+def get_rf_n_jobs() -> int:
+    """Threads used by the random forest per prediction call
+
+    Defaults to all cores for a single worker and to 1 when uvicorn runs several
+    workers (WEB_CONCURRENCY > 1), which would otherwise oversubscribe the CPU.
+    """
+    if 'RF_N_JOBS' in os.environ:
+        return int(os.environ['RF_N_JOBS'])
+    return -1 if int(os.getenv('WEB_CONCURRENCY', 1)) <= 1 else 1
+
 class ModelLoader:
     def __init__(self, model_dir: str = "models"):
         self.model_dir = Path(model_dir)
         self.models = {}
         self.encoders = {}
+        self.categorical_maps = {}
         self.feature_names = [
             'no_of_dependents', 'education', 'self_employed', 'income_annum',
             'loan_amount', 'loan_term', 'cibil_score', 'residential_assets_value',
             'commercial_assets_value', 'luxury_assets_value', 'bank_asset_value'
         ]
+        self._reload_callbacks = []
         self.load_models()
     
     def load_models(self):
@@ -25,12 +40,21 @@ class ModelLoader:
             self.models['random_forest'] = joblib.load(
                 self.model_dir / 'enc1_random_forest.pkl'
             )
+            self.models['random_forest'].n_jobs = get_rf_n_jobs()
             self.models['decision_tree'] = joblib.load(
                 self.model_dir / 'enc1_decision_tree.pkl'
             )
-            self.models['shap'] = joblib.load(
-                self.model_dir / 'enc1_shap_tree.pkl'
+            # Use the ONNX export of the random forest for inference when available;
+            # the sklearn model is still needed for SHAP
+            onnx_model = load_onnx_model(
+                self.model_dir / 'enc1_random_forest.onnx',
+                self.models['random_forest'].classes_
             )
+            if onnx_model is not None:
+                self.models['random_forest_onnx'] = onnx_model
+            else:
+                self.models.pop('random_forest_onnx', None)
+            
             # Load encoders
             self.encoders['object_encoder'] = joblib.load(
                 self.model_dir / 'encoder' / 'enc1_object_encoder.pkl'
@@ -39,24 +63,47 @@ class ModelLoader:
                 self.model_dir / 'encoder' / 'enc1_target_encoder.pkl'
             )
             
+            # Precompute category -> code lookups equivalent to the object encoder
+            object_encoder = self.encoders['object_encoder']
+            self.categorical_maps = {
+                column: {category: code for code, category in enumerate(categories)}
+                for column, categories in zip(object_encoder.feature_names_in_, object_encoder.categories_)
+            }
+            
             logger.info("Models and encoders loaded successfully")
             
+            # Invalidate anything derived from the previous models
+            for callback in self._reload_callbacks:
+                callback()
+            
         except Exception as e:
             logger.error(f"Error loading models: {e}")
             raise
     
+    def register_reload_callback(self, callback):
+        """Register a callable to run whenever models are (re)loaded"""
+        self._reload_callbacks.append(callback)
+    
     def get_model(self, model_name: str = 'random_forest'):
         """Get a specific model"""
         if model_name not in self.models:
             raise ValueError(f"Model {model_name} not found")
         return self.models[model_name]
     
+    def get_inference_model(self, model_name: str = 'random_forest'):
+        """Get the fastest available implementation of a model for prediction"""
+        return self.models.get(f'{model_name}_onnx') or self.get_model(model_name)
+    
     def get_encoder(self, encoder_name: str):
         """Get a specific encoder"""
         if encoder_name not in self.encoders:
             raise ValueError(f"Encoder {encoder_name} not found")
         return self.encoders[encoder_name]
     
+    def get_categorical_maps(self):
+        """Get category -> code lookups for the categorical columns"""
+        return self.categorical_maps
+    
     def get_feature_names(self):
         """Get feature names"""
         return self.feature_names.copy()
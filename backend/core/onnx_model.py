@@ -0,0 +1,67 @@
+import numpy as np
+from pathlib import Path
+import logging
+
+try:
+    import onnxruntime as ort
+except ImportError:  # onnxruntime is optional
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+ONNX_INPUT_NAME = 'X'
+
+class OnnxClassifier:
+    """Adapter exposing the sklearn classifier API on top of an ONNX session"""
+
+    def __init__(self, path: Path, classes: np.ndarray):
+        self.session = ort.InferenceSession(str(path), providers=['CPUExecutionProvider'])
+        self.classes_ = classes
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Return class probabilities, computed by onnxruntime
+
+        The session outputs float32; widen to float64 and round away the
+        float32 noise so confidence buckets match the sklearn model.
+        """
+        features = np.asarray(X, dtype=np.float32)
+        probabilities = self.session.run(None, {ONNX_INPUT_NAME: features})[1]
+        return np.round(probabilities.astype(np.float64), 6)
+
+    def predict(self, X) -> np.ndarray:
+        """Return the most likely class for each row"""
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+def load_onnx_model(path: Path, classes: np.ndarray):
+    """Load an ONNX model if both the file and onnxruntime are available"""
+    if ort is None or not path.exists():
+        return None
+    logger.info(f"Loading ONNX model from {path}")
+    return OnnxClassifier(path, classes)
+
+def convert_to_onnx(model, path: Path, n_features: int):
+    """Export a fitted sklearn classifier to ONNX (requires skl2onnx)
+
+    The export is also the float32 form of the forest: with a float input type
+    the TreeEnsembleClassifier node stores its thresholds and leaf values as
+    32-bit floats, halving the bytes read per node compared to sklearn's
+    float64 trees.
+    """
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[(ONNX_INPUT_NAME, FloatTensorType([None, n_features]))],
+        options={type(model): {'zipmap': False}}
+    )
+    Path(path).write_bytes(onnx_model.SerializeToString())
+
+if __name__ == "__main__":
+    # One-time conversion: run `python -m core.onnx_model` from the backend directory
+    import joblib
+
+    model_dir = Path("models")
+    model = joblib.load(model_dir / 'enc1_random_forest.pkl')
+    convert_to_onnx(model, model_dir / 'enc1_random_forest.onnx', model.n_features_in_)
+    print(f"Saved {model_dir / 'enc1_random_forest.onnx'}")
@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Union
 from core.model_loader import model_loader
+from core.cache import ResultCache, make_cache_key
+from core.utils import SCHEMA_DTYPES
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,11 +12,15 @@ class LoanPredictor:
     def __init__(self):
         self.model_loader = model_loader
         self.object_columns = ['education', 'self_employed']
-        
-    def preprocess_data(self, data: Union[Dict[str, Any], pd.DataFrame]) -> pd.DataFrame:
+        self.cache = ResultCache()
+        self.model_loader.register_reload_callback(self.cache.clear)
+    
+    def preprocess_data(self, data: Union[Dict[str, Any], List[Dict[str, Any]], pd.DataFrame]) -> pd.DataFrame:
         """Preprocess input data for prediction"""
         if isinstance(data, dict):
             df = pd.DataFrame([data])
+        elif isinstance(data, list):
+            df = self._records_to_frame(data)
         else:
             df = data.copy()
         
@@ -27,41 +33,60 @@ class LoanPredictor:
         # Reorder columns to match training data
         df = df[required_columns]
         
-        # Apply object encoding to categorical columns
-        object_encoder = self.model_loader.get_encoder('object_encoder')
-        df[self.object_columns] = object_encoder.transform(df[self.object_columns])
+        # Encode categorical columns with dict lookups
+        for column, mapping in self.model_loader.get_categorical_maps().items():
+            encoded = df[column].map(mapping)
+            if encoded.isna().any():
+                unknown = df.loc[encoded.isna(), column].unique().tolist()
+                raise ValueError(f"Unknown category for {column}: {unknown}")
+            # Small integer codes keep a downcast frame in float32 for the model
+            df[column] = encoded.astype(np.int8)
         
         return df
     
+    def _records_to_frame(self, records: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Build a DataFrame column by column from a list of validated records
+        
+        Numeric columns are downcast to SCHEMA_DTYPES, the same compact types
+        the CSV path scores with.
+        """
+        columns = {}
+        for feature in self.model_loader.get_feature_names():
+            try:
+                columns[feature] = [record[feature] for record in records]
+            except KeyError:
+                raise ValueError(f"Missing required column: {feature}")
+        return pd.DataFrame(columns, copy=False).astype(SCHEMA_DTYPES, copy=False)
+    
     def predict_single(self, data: Dict[str, Any], model_name: str = 'random_forest') -> Dict[str, Any]:
         """Make prediction for a single data point"""
+        return self.predict_batch([data], model_name)[0]
+    
+    def predict_dataframe(self, data: Union[pd.DataFrame, List[Dict[str, Any]]], model_name: str = 'random_forest') -> pd.DataFrame:
+        """Make vectorized predictions for validated applications (DataFrame or records)"""
+        return self.predict_preprocessed(self.preprocess_data(data), model_name)
+    
+    def predict_preprocessed(self, processed_data: pd.DataFrame, model_name: str = 'random_forest') -> pd.DataFrame:
+        """Make vectorized predictions for already preprocessed data"""
         try:
-            # Preprocess data
-            processed_data = self.preprocess_data(data)
-            
-            # Get model
-            model = self.model_loader.get_model(model_name)
+            # Score the whole frame at once
+            model = self.model_loader.get_inference_model(model_name)
+            prediction_proba = model.predict_proba(processed_data)
             
-            # Make prediction
-            prediction_proba = model.predict_proba(processed_data)[0]
-            prediction = model.predict(processed_data)[0]
+            # Pick the most likely class for every row
+            predictions = model.classes_.take(prediction_proba.argmax(axis=1))
+            probabilities = prediction_proba.max(axis=1)
             
-            # Convert prediction back to original labels
+            # Convert predictions back to original labels
             target_encoder = self.model_loader.get_encoder('target_encoder')
-            prediction_label = target_encoder.inverse_transform([prediction])[0]
+            prediction_labels = target_encoder.inverse_transform(predictions)
             
-            # Get probability for the predicted class
-            prob = prediction_proba[prediction]
-            
-            # Determine confidence level
-            confidence = self._get_confidence_level(prob)
-            
-            return {
-                'prediction': prediction_label,
-                'probability': float(prob),
-                'confidence': confidence,
+            return pd.DataFrame({
+                'prediction': prediction_labels,
+                'probability': probabilities.astype(float),
+                'confidence': self._get_confidence_levels(probabilities),
                 'prediction_proba': prediction_proba.tolist()
-            }
+            }, index=processed_data.index)
             
         except Exception as e:
             logger.error(f"Prediction error: {e}")
@@ -69,13 +94,24 @@ class LoanPredictor:
     
     def predict_batch(self, data: List[Dict[str, Any]], model_name: str = 'random_forest') -> List[Dict[str, Any]]:
         """Make predictions for batch data"""
-        results = []
-        for item in data:
-            result = self.predict_single(item, model_name)
-            results.append(result)
-        return results
+        if not data:
+            return []
+        
+        # Serve repeated inputs from the cache
+        cache_keys = [make_cache_key(item, model_name) for item in data]
+        results = [self.cache.get(key) for key in cache_keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        
+        # Score all remaining items in one pass instead of one model call per item
+        if misses:
+            predictions = self.predict_dataframe(self._records_to_frame([data[i] for i in misses]), model_name)
+            for i, result in zip(misses, predictions.to_dict('records')):
+                self.cache.put(cache_keys[i], result)
+                results[i] = result
+        
+        return [dict(result) for result in results]
     
-    def _get_confidence_level(self, probability: float) -> str:
+    def get_confidence_level(self, probability: float) -> str:
         """Determine confidence level based on probability"""
         if probability >= 0.8:
             return "High"
@@ -83,6 +119,14 @@ class LoanPredictor:
             return "Medium"
         else:
             return "Low"
+    
+    def _get_confidence_levels(self, probabilities: np.ndarray) -> np.ndarray:
+        """Vectorized version of get_confidence_level"""
+        return np.select(
+            [probabilities >= 0.8, probabilities >= 0.6],
+            ["High", "Medium"],
+            default="Low"
+        )
 
 # Global predictor instance
 predictor = LoanPredictor()
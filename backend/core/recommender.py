@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from core.explainer import explainer
 import logging
 
@@ -10,11 +10,12 @@ class LoanRecommender:
     def __init__(self):
         self.explainer = explainer
         
-    def generate_recommendations(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_recommendations(self, data: Dict[str, Any], explanation: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate recommendations for loan approval improvement"""
         try:
-            # Get explanation first
-            explanation = self.explainer.explain_prediction(data)
+            # Get explanation first, unless the caller already has one
+            if explanation is None:
+                explanation = self.explainer.explain_prediction(data)
             
             # Only generate recommendations if loan is rejected
             if explanation['prediction'].strip() == 'Approved':
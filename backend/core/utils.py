@@ -1,20 +1,55 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+import math
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Iterator, Mapping, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+REQUIRED_FIELDS = [
+    'no_of_dependents', 'education', 'self_employed', 'income_annum',
+    'loan_amount', 'loan_term', 'cibil_score', 'residential_assets_value',
+    'commercial_assets_value', 'luxury_assets_value', 'bank_asset_value'
+]
+INT_FIELDS = ('no_of_dependents', 'loan_term', 'cibil_score')
+FLOAT_FIELDS = (
+    'income_annum', 'loan_amount', 'residential_assets_value',
+    'commercial_assets_value', 'luxury_assets_value', 'bank_asset_value'
+)
+
+# Compact dtypes for validated numeric columns; tree models score in float32
+# anyway, so the narrower types do not change predictions
+SCHEMA_DTYPES = {
+    'no_of_dependents': np.int8, 'loan_term': np.int8, 'cibil_score': np.int16,
+    **{field: np.float32 for field in FLOAT_FIELDS}
+}
+# Largest amount that survives the float32 cast the models score with
+MAX_AMOUNT = float(np.finfo(np.float32).max)
+
+# Accepted categorical values mapped to the encoder format (leading space)
+EDUCATION_VALUES = {
+    'Graduate': ' Graduate', 'Not Graduate': ' Not Graduate',
+    ' Graduate': ' Graduate', ' Not Graduate': ' Not Graduate'
+}
+SELF_EMPLOYED_VALUES = {'Yes': ' Yes', 'No': ' No', ' Yes': ' Yes', ' No': ' No'}
+
+# Allowed ranges as (field, minimum, maximum, error message), checked in order
+RANGE_CHECKS = (
+    ('no_of_dependents', 0, 10, "Number of dependents must be between 0 and 10"),
+    ('cibil_score', 300, 900, "CIBIL score must be between 300 and 900"),
+    ('loan_term', 1, 30, "Loan term must be between 1 and 30 years")
+)
+
 def validate_loan_input(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Validate and clean loan input data"""
-    required_fields = [
-        'no_of_dependents', 'education', 'self_employed', 'income_annum',
-        'loan_amount', 'loan_term', 'cibil_score', 'residential_assets_value',
-        'commercial_assets_value', 'luxury_assets_value', 'bank_asset_value'
-    ]
-    
+    """Validate and clean loan input data
+
+    API requests are validated by the LoanInput schema; this is for callers
+    working with plain dicts (scripts, notebooks).
+    """
     # Check for missing fields
-    missing_fields = [field for field in required_fields if field not in data]
+    missing_fields = [field for field in REQUIRED_FIELDS if field not in data]
     if missing_fields:
         raise ValueError(f"Missing required fields: {missing_fields}")
     
@@ -22,60 +57,107 @@ def validate_loan_input(data: Dict[str, Any]) -> Dict[str, Any]:
     cleaned_data = data.copy()
     
     # Integer fields
-    int_fields = ['no_of_dependents', 'loan_term', 'cibil_score']
-    for field in int_fields:
+    for field in INT_FIELDS:
         try:
             cleaned_data[field] = int(cleaned_data[field])
-        except (ValueError, TypeError):
+        except (ValueError, TypeError, OverflowError):
             raise ValueError(f"Invalid value for {field}: must be an integer")
     
     # Float fields
-    float_fields = [
-        'income_annum', 'loan_amount', 'residential_assets_value',
-        'commercial_assets_value', 'luxury_assets_value', 'bank_asset_value'
-    ]
-    for field in float_fields:
+    for field in FLOAT_FIELDS:
         try:
-            cleaned_data[field] = float(cleaned_data[field])
-            if cleaned_data[field] < 0:
-                raise ValueError(f"Invalid value for {field}: must be positive")
-        except (ValueError, TypeError):
+            value = float(cleaned_data[field])
+        except (ValueError, TypeError, OverflowError):
+            raise ValueError(f"Invalid value for {field}: must be a number")
+        if not math.isfinite(value):
             raise ValueError(f"Invalid value for {field}: must be a number")
+        if value < 0:
+            raise ValueError(f"Invalid value for {field}: must be positive")
+        if value > MAX_AMOUNT:
+            raise ValueError(f"Invalid value for {field}: too large")
+        cleaned_data[field] = value
     
-    # String fields - normalize by adding leading space if missing
-    if 'education' in cleaned_data:
-        edu_val = cleaned_data['education']
-        if edu_val in ['Graduate', 'Not Graduate']:
-            cleaned_data['education'] = f" {edu_val}"
-        elif edu_val not in [' Graduate', ' Not Graduate']:
-            raise ValueError("Education must be 'Graduate' or 'Not Graduate'")
+    # String fields - normalize by adding leading space if missing (non-strings
+    # such as lists are unhashable, so they are rejected before the lookup)
+    education = cleaned_data['education']
+    education = EDUCATION_VALUES.get(education) if isinstance(education, str) else None
+    if education is None:
+        raise ValueError("Education must be 'Graduate' or 'Not Graduate'")
+    cleaned_data['education'] = education
     
-    if 'self_employed' in cleaned_data:
-        emp_val = cleaned_data['self_employed']
-        if emp_val in ['Yes', 'No']:
-            cleaned_data['self_employed'] = f" {emp_val}"
-        elif emp_val not in [' Yes', ' No']:
-            raise ValueError("Self_employed must be 'Yes' or 'No'")
+    self_employed = cleaned_data['self_employed']
+    self_employed = SELF_EMPLOYED_VALUES.get(self_employed) if isinstance(self_employed, str) else None
+    if self_employed is None:
+        raise ValueError("Self_employed must be 'Yes' or 'No'")
+    cleaned_data['self_employed'] = self_employed
     
     # Range validations
-    if not (0 <= cleaned_data['no_of_dependents'] <= 10):
-        raise ValueError("Number of dependents must be between 0 and 10")
+    for field, minimum, maximum, message in RANGE_CHECKS:
+        if not (minimum <= cleaned_data[field] <= maximum):
+            raise ValueError(message)
+
+    return cleaned_data
+
+def validate_loan_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """Validate and clean a DataFrame of loan applications column-wise
+
+    Returns the cleaned DataFrame together with a Series holding the first
+    validation error of each row (None for valid rows), so callers can mark
+    bad rows instead of failing the whole batch.
+    """
+    missing_fields = [field for field in REQUIRED_FIELDS if field not in df.columns]
+    if missing_fields:
+        raise ValueError(f"Missing required fields: {missing_fields}")
     
-    if not (300 <= cleaned_data['cibil_score'] <= 900):
-        raise ValueError("CIBIL score must be between 300 and 900")
+    cleaned_df = df[REQUIRED_FIELDS].copy()
+    errors = pd.Series(None, index=df.index, dtype=object)
     
-    if not (1 <= cleaned_data['loan_term'] <= 30):
-        raise ValueError("Loan term must be between 1 and 30 years")
+    def flag(mask: pd.Series, message: str):
+        # Keep only the first error reported for each row
+        errors[mask & errors.isna()] = message
     
-    return cleaned_data
+    # Integer fields - fractional values are rejected, not truncated
+    for field in INT_FIELDS:
+        values = pd.to_numeric(cleaned_df[field], errors='coerce')
+        whole = values.notna() & (values % 1 == 0)
+        flag(~whole, f"Invalid value for {field}: must be an integer")
+        cleaned_df[field] = values.where(whole, 0).astype(np.int64)
+    
+    # Float fields
+    for field in FLOAT_FIELDS:
+        values = pd.to_numeric(cleaned_df[field], errors='coerce')
+        flag(values.isna() | np.isinf(values), f"Invalid value for {field}: must be a number")
+        flag(values < 0, f"Invalid value for {field}: must be positive")
+        flag(values > MAX_AMOUNT, f"Invalid value for {field}: too large")
+        cleaned_df[field] = values.astype(np.float64)
+    
+    # String fields - normalize by adding leading space if missing
+    education = cleaned_df['education'].map(EDUCATION_VALUES)
+    flag(education.isna(), "Education must be 'Graduate' or 'Not Graduate'")
+    cleaned_df['education'] = education
+    
+    self_employed = cleaned_df['self_employed'].map(SELF_EMPLOYED_VALUES)
+    flag(self_employed.isna(), "Self_employed must be 'Yes' or 'No'")
+    cleaned_df['self_employed'] = self_employed
+    
+    # Range validations
+    for field, minimum, maximum, message in RANGE_CHECKS:
+        flag(~cleaned_df[field].between(minimum, maximum), message)
+    
+    return cleaned_df, errors
 
+@lru_cache(maxsize=4096)
 def format_currency(amount: float) -> str:
     """Format amount as Indian currency"""
-    return f"₹{amount:,.0f}"
+    if not math.isfinite(amount):
+        # round() cannot convert nan/inf to an int
+        return f"₹{amount:,.0f}"
+    return "₹" + format(round(amount), ",d")
 
-def get_sample_data() -> Dict[str, Any]:
-    """Get sample data for template"""
-    return {
+@lru_cache(maxsize=1)
+def get_sample_data() -> Mapping[str, Any]:
+    """Get sample data for template (read-only, built once)"""
+    return MappingProxyType({
         'no_of_dependents': 2,
         'education': ' Graduate',
         'self_employed': ' No',
@@ -87,21 +169,36 @@ def get_sample_data() -> Dict[str, Any]:
         'commercial_assets_value': 3000000,
         'luxury_assets_value': 2000000,
         'bank_asset_value': 1000000
-    }
+    })
+
+# The template never changes, so serialize it once at import time
+_TEMPLATE_CSV = (
+    ",".join(get_sample_data().keys()) + "\n"
+    + ",".join(str(value) for value in get_sample_data().values()) + "\n"
+)
+_TEMPLATE_CSV_BYTES = _TEMPLATE_CSV.encode('utf-8')
 
 def create_template_csv() -> str:
     """Create template CSV content"""
-    sample_data = get_sample_data()
-    df = pd.DataFrame([sample_data])
-    return df.to_csv(index=False)
+    return _TEMPLATE_CSV
+
+def create_template_csv_bytes() -> bytes:
+    """Template CSV content, already encoded for the response body"""
+    return _TEMPLATE_CSV_BYTES
+
+def iter_csv_chunks(df: pd.DataFrame, chunksize: int = 1000) -> Iterator[str]:
+    """Serialize a DataFrame to CSV text chunk by chunk"""
+    yield df.iloc[:chunksize].to_csv(index=False)
+    for start in range(chunksize, len(df), chunksize):
+        yield df.iloc[start:start + chunksize].to_csv(index=False, header=False)
 
 def log_request(endpoint: str, data: Dict[str, Any]):
-    """Log API request"""
-    logger.info(f"API Request to {endpoint}: {data}")
+    """Log API request (formatting is deferred until a handler emits it)"""
+    logger.info("API Request to %s: %s", endpoint, data)
 
 def log_response(endpoint: str, response: Dict[str, Any]):
-    """Log API response"""
-    logger.info(f"API Response from {endpoint}: {response}")
+    """Log API response (formatting is deferred until a handler emits it)"""
+    logger.info("API Response from %s: %s", endpoint, response)
 
 def handle_api_error(error: Exception, endpoint: str) -> Dict[str, Any]:
     """Handle API errors consistently"""
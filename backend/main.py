@@ -1,6 +1,9 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
 import sys
 import os
 
@@ -8,18 +11,28 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import routers
-from api.endpoints import router
+from api.endpoints import router, prediction_batcher, explanation_batcher
 from core.model_loader import model_loader
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('loan_prediction_api.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Configure logging; records are queued and written by a background thread
+# so file and console I/O never block the event loop. QueueHandler still
+# formats each record on the calling thread, so outside dev the default level
+# is WARNING and the per-request INFO logs are never built. Set LOG_LEVEL=INFO
+# to get them back.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO" if os.getenv("ENV") == "dev" else "WARNING")
+
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [logging.FileHandler('loan_prediction_api.log'), logging.StreamHandler(sys.stdout)]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, *log_handlers)
+log_listener.start()
+
+root_logger = logging.getLogger()
+root_logger.setLevel(LOG_LEVEL)
+root_logger.addHandler(QueueHandler(log_queue))
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +42,8 @@ app = FastAPI(
     description="A FastAPI backend for credit risk prediction with ML models",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -61,6 +75,9 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down Loan Prediction API...")
+    await prediction_batcher.stop()
+    await explanation_batcher.stop()
+    log_listener.stop()
 
 # Root endpoint
 @app.get("/")
@@ -88,10 +105,30 @@ async def general_exception_handler(request, exc):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    )
+    port = int(os.getenv("PORT", 8000))
+    
+    if os.getenv("ENV") == "dev":
+        # Auto-reload runs a single worker with a file watcher
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            reload=True,
+            log_level="info",
+            access_log=False
+        )
+    else:
+        workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 2))
+        # Worker processes inherit this, so each sizes its forest threads accordingly
+        os.environ["WEB_CONCURRENCY"] = str(workers)
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            workers=workers,
+            # "auto" picks uvloop where it is installed (not on Windows)
+            loop="auto",
+            http="httptools",
+            log_level="warning",
+            access_log=False
+        )
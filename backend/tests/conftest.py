@@ -0,0 +1,18 @@
+"""Shared test setup: import from and run in the backend directory"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, BACKEND_DIR)
+# Models are loaded from the relative models/ directory at import time
+os.chdir(BACKEND_DIR)
+
+import pytest
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient for the FastAPI app"""
+    from fastapi.testclient import TestClient
+    from main import app
+    return TestClient(app)
@@ -0,0 +1,36 @@
+"""Tests for AsyncBatcher fault isolation"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.batcher import AsyncBatcher
+
+def process_batch(items):
+    """Double every item, failing the whole batch if any item is negative"""
+    if any(item < 0 for item in items):
+        raise ValueError(f"negative item in {items}")
+    return [item * 2 for item in items]
+
+async def submit_all(items):
+    batcher = AsyncBatcher(process_batch, max_batch_size=len(items), max_latency_ms=50)
+    try:
+        return await asyncio.gather(*(batcher.submit(item) for item in items), return_exceptions=True)
+    finally:
+        await batcher.stop()
+
+def test_batch_results_are_returned_per_item():
+    assert asyncio.run(submit_all([1, 2, 3])) == [2, 4, 6]
+
+def test_failing_item_does_not_fail_its_batch():
+    results = asyncio.run(submit_all([1, 2, -1, 3, 4]))
+
+    assert results[:2] == [2, 4]
+    assert results[3:] == [6, 8]
+    assert isinstance(results[2], ValueError)
+
+def test_single_failing_item_gets_its_error():
+    [result] = asyncio.run(submit_all([-1]))
+
+    assert isinstance(result, ValueError)
@@ -0,0 +1,63 @@
+"""Tests for ResultCache and the prediction/explanation result caches"""
+from core.cache import ResultCache, make_cache_key
+from core.explainer import explainer
+from core.model_loader import model_loader
+from core.predictor import predictor
+from core.utils import get_sample_data
+
+def application(**overrides):
+    return {**get_sample_data(), **overrides}
+
+def test_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'a' is now the most recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert len(cache) == 2
+
+def test_put_refreshes_existing_key():
+    cache = ResultCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('a', 10)
+    cache.put('c', 3)
+    assert cache.get('a') == 10
+    assert cache.get('b') is None
+
+def test_key_ignores_field_order_and_includes_extras():
+    data = application()
+    reordered = dict(reversed(list(data.items())))
+    assert make_cache_key(data, 'random_forest') == make_cache_key(reordered, 'random_forest')
+    assert make_cache_key(data, 'random_forest') != make_cache_key(data, 'decision_tree')
+    assert make_cache_key(data) != make_cache_key(application(cibil_score=751))
+
+def test_predict_and_explain_cache_under_the_same_key():
+    predictor.cache.clear()
+    explainer.cache.clear()
+    data = application(cibil_score=612)
+    key = make_cache_key(data, 'random_forest')
+    
+    prediction = predictor.predict_batch([data])[0]
+    explanation = explainer.explain_batch([data])[0]
+    assert predictor.cache.get(key) == prediction
+    assert explainer.cache.get(key) == explanation
+    assert explanation['prediction'] == prediction['prediction']
+    assert explanation['probability'] == prediction['probability']
+    
+    # A hit returns a copy, so callers cannot corrupt the cached result
+    prediction['prediction'] = 'tampered'
+    assert predictor.predict_batch([dict(reversed(list(data.items())))])[0] != prediction
+    assert len(predictor.cache) == 1
+
+def test_model_reload_clears_caches():
+    data = application(cibil_score=613)
+    predictor.predict_batch([data])
+    explainer.explain_batch([data])
+    assert len(predictor.cache) and len(explainer.cache)
+    
+    model_loader.load_models()
+    assert len(predictor.cache) == 0
+    assert len(explainer.cache) == 0
@@ -0,0 +1,45 @@
+"""Tests for ranking SHAP values in LoanExplainer._get_top_features"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.explainer import explainer
+
+FEATURES = [f'f{i}' for i in range(11)]
+ROW = pd.Series(np.arange(11, dtype=float), index=FEATURES)
+
+def top_features(values, top_n=5):
+    shap_values = dict(zip(FEATURES, values))
+    return [item['feature'] for item in explainer._get_top_features(shap_values, ROW, top_n)]
+
+def stable_sort_reference(values, top_n=5):
+    """The ranking before argpartition: stable sort by absolute SHAP value"""
+    items = sorted(zip(FEATURES, values), key=lambda item: abs(item[1]), reverse=True)
+    return [feature for feature, _ in items[:top_n]]
+
+def test_ranked_by_absolute_value():
+    values = [0.0, -0.5, 0.1, 0.3, -0.2, 0.05, 0.0, 0.4, 0.0, -0.01, 0.0]
+    assert top_features(values) == ['f1', 'f7', 'f3', 'f4', 'f2']
+
+def test_ties_keep_feature_order():
+    assert top_features([0.1] * 11) == ['f0', 'f1', 'f2', 'f3', 'f4']
+    assert top_features([0.1, -0.1] * 5 + [0.3]) == ['f10', 'f0', 'f1', 'f2', 'f3']
+
+def test_ties_at_the_cutoff_match_stable_sort():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        values = (rng.integers(-3, 4, len(FEATURES)) / 10).tolist()
+        assert top_features(values) == stable_sort_reference(values)
+
+@pytest.mark.parametrize("top_n", [0, 1, 11, 20])
+def test_top_n_is_clamped(top_n):
+    values = np.linspace(-1, 1, 11).tolist()
+    assert top_features(values, top_n) == stable_sort_reference(values, top_n)
+
+def test_entry_fields():
+    values = [0.0] * 10 + [-0.25]
+    first = explainer._get_top_features(dict(zip(FEATURES, values)), ROW)[0]
+    assert first == {
+        'rank': 1, 'feature': 'f10', 'shap_value': -0.25, 'feature_value': 10.0,
+        'impact': 'Negative', 'importance': 0.25
+    }
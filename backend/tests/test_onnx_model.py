@@ -0,0 +1,49 @@
+"""Parity tests for the optional ONNX export of the random forest"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("skl2onnx")
+
+from core.onnx_model import convert_to_onnx, load_onnx_model
+from core.predictor import predictor
+from core.utils import validate_loan_dataframe
+
+DATASET = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..',
+    'data', 'original', 'loan_approval_dataset.csv'
+)
+
+@pytest.fixture(scope="module")
+def models(tmp_path_factory):
+    model = predictor.model_loader.get_model('random_forest')
+    path = tmp_path_factory.mktemp("onnx") / 'enc1_random_forest.onnx'
+    convert_to_onnx(model, path, model.n_features_in_)
+    return model, load_onnx_model(path, model.classes_)
+
+@pytest.fixture(scope="module")
+def features():
+    df = pd.read_csv(DATASET, skipinitialspace=True)
+    validated_df, errors = validate_loan_dataframe(df)
+    # A few training rows have negative asset values; score only valid ones
+    return predictor.preprocess_data(validated_df[errors.isna()])
+
+def test_probabilities_match_sklearn(models, features):
+    model, onnx_model = models
+    expected = model.predict_proba(features)
+    actual = onnx_model.predict_proba(features)
+    assert actual.dtype == np.float64
+    np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+def test_predictions_and_confidence_match_sklearn(models, features):
+    model, onnx_model = models
+    expected = model.predict_proba(features).max(axis=1)
+    actual = onnx_model.predict_proba(features).max(axis=1)
+    np.testing.assert_array_equal(onnx_model.predict(features), model.predict(features))
+    np.testing.assert_array_equal(
+        predictor._get_confidence_levels(actual),
+        predictor._get_confidence_levels(expected)
+    )
@@ -0,0 +1,64 @@
+"""Tests for LoanInput request validation on the JSON endpoints"""
+import pytest
+from pydantic import ValidationError
+
+from api.schemas import LoanInput
+from core.utils import MAX_AMOUNT, get_sample_data
+
+def application(**overrides):
+    return {**get_sample_data(), **overrides}
+
+def test_invalid_payload_returns_422_with_error_list(client):
+    response = client.post("/api/v1/predict", json=application(cibil_score=100))
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert isinstance(detail, list) and len(detail) == 1
+    assert detail[0]["loc"] == ["body", "cibil_score"]
+    assert detail[0]["type"] == "greater_than_equal"
+
+def test_batch_error_location_includes_item_index(client):
+    payload = {"data": [application(), application(loan_term=0)]}
+    response = client.post("/api/v1/predict/batch", json=payload)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "data", 1, "loan_term"]
+
+@pytest.mark.parametrize("education, self_employed", [
+    ("Graduate", "No"),
+    (" Graduate", " No"),
+    ("Not Graduate", "Yes"),
+    (" Not Graduate", " Yes"),
+])
+def test_categories_accept_both_spellings(education, self_employed):
+    loan = LoanInput(**application(education=education, self_employed=self_employed))
+    assert loan.education == " " + education.strip()
+    assert loan.self_employed == " " + self_employed.strip()
+
+@pytest.mark.parametrize("field, value", [
+    ("education", "PhD"),
+    ("education", "graduate"),
+    ("self_employed", "Maybe"),
+    ("self_employed", ["Yes"]),
+])
+def test_unknown_categories_are_rejected(field, value):
+    with pytest.raises(ValidationError):
+        LoanInput(**application(**{field: value}))
+
+@pytest.mark.parametrize("field", ["no_of_dependents", "loan_term", "cibil_score"])
+def test_fractional_integers_are_rejected(field):
+    with pytest.raises(ValidationError) as excinfo:
+        LoanInput(**application(**{field: 2.5}))
+    assert excinfo.value.errors()[0]["loc"] == (field,)
+
+def test_whole_float_integers_are_accepted():
+    assert LoanInput(**application(cibil_score=750.0)).cibil_score == 750
+
+def test_amount_bound_is_float32_max(client):
+    assert LoanInput(**application(income_annum=MAX_AMOUNT)).income_annum == MAX_AMOUNT
+    response = client.post("/api/v1/predict", json=application(income_annum=1e40))
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "less_than_equal"
+
+@pytest.mark.parametrize("value", [-1, float("inf"), float("nan")])
+def test_negative_and_non_finite_amounts_are_rejected(value):
+    with pytest.raises(ValidationError):
+        LoanInput(**application(loan_amount=value))
@@ -0,0 +1,35 @@
+"""Tests for ETag revalidation of the /template endpoint"""
+import hashlib
+
+import pytest
+
+from core.utils import create_template_csv_bytes
+
+URL = "/api/v1/template"
+ETAG = f'"{hashlib.sha1(create_template_csv_bytes()).hexdigest()}"'
+
+def test_template_has_strong_etag_and_cache_headers(client):
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.content == create_template_csv_bytes()
+    assert response.headers['etag'] == ETAG
+    assert response.headers['cache-control'] == "public, max-age=86400"
+    assert response.headers['content-type'].startswith("text/csv")
+
+@pytest.mark.parametrize("if_none_match", [
+    ETAG,
+    f"W/{ETAG}",
+    f'"stale", {ETAG}',
+    "*",
+])
+def test_matching_if_none_match_returns_304(client, if_none_match):
+    response = client.get(URL, headers={'If-None-Match': if_none_match})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers['etag'] == ETAG
+
+@pytest.mark.parametrize("if_none_match", ['"stale"', "", ETAG.strip('"')])
+def test_other_if_none_match_returns_template(client, if_none_match):
+    response = client.get(URL, headers={'If-None-Match': if_none_match})
+    assert response.status_code == 200
+    assert response.content == create_template_csv_bytes()
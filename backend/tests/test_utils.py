@@ -0,0 +1,76 @@
+"""Tests for the column-wise validator used by /predict/csv"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.utils import MAX_AMOUNT, REQUIRED_FIELDS, get_sample_data, validate_loan_dataframe
+
+def frame(*rows):
+    return pd.DataFrame([{**get_sample_data(), **row} for row in rows])
+
+def messages(errors):
+    """Error messages per row, None for valid rows"""
+    return [error if isinstance(error, str) else None for error in errors]
+
+def test_valid_rows_are_cleaned_and_normalized():
+    df = frame({'education': 'Graduate', 'self_employed': 'Yes'}, {'cibil_score': '700'})
+    cleaned_df, errors = validate_loan_dataframe(df)
+    assert errors.isna().all()
+    assert list(cleaned_df.columns) == REQUIRED_FIELDS
+    assert cleaned_df['education'].tolist() == [' Graduate', ' Graduate']
+    assert cleaned_df['self_employed'].tolist() == [' Yes', ' No']
+    assert cleaned_df['cibil_score'].tolist() == [750, 700]
+    assert cleaned_df['cibil_score'].dtype == np.int64
+    assert cleaned_df['income_annum'].dtype == np.float64
+
+def test_missing_columns_raise():
+    with pytest.raises(ValueError, match="Missing required fields: \\['cibil_score'\\]"):
+        validate_loan_dataframe(frame({}).drop(columns='cibil_score'))
+
+@pytest.mark.parametrize("row, message", [
+    ({'no_of_dependents': 2.5}, "Invalid value for no_of_dependents: must be an integer"),
+    ({'loan_term': '2.5'}, "Invalid value for loan_term: must be an integer"),
+    ({'cibil_score': 'abc'}, "Invalid value for cibil_score: must be an integer"),
+    ({'cibil_score': np.inf}, "Invalid value for cibil_score: must be an integer"),
+    ({'income_annum': 'abc'}, "Invalid value for income_annum: must be a number"),
+    ({'loan_amount': np.inf}, "Invalid value for loan_amount: must be a number"),
+    ({'bank_asset_value': -1}, "Invalid value for bank_asset_value: must be positive"),
+    ({'income_annum': 1e40}, "Invalid value for income_annum: too large"),
+    ({'education': 'PhD'}, "Education must be 'Graduate' or 'Not Graduate'"),
+    ({'self_employed': 'Maybe'}, "Self_employed must be 'Yes' or 'No'"),
+    ({'no_of_dependents': 11}, "Number of dependents must be between 0 and 10"),
+    ({'cibil_score': 299}, "CIBIL score must be between 300 and 900"),
+    ({'loan_term': 31}, "Loan term must be between 1 and 30 years"),
+])
+def test_bad_row_is_flagged_without_failing_the_others(row, message):
+    cleaned_df, errors = validate_loan_dataframe(frame({}, row, {}))
+    assert messages(errors) == [None, message, None]
+
+def test_whole_float_integers_are_accepted():
+    cleaned_df, errors = validate_loan_dataframe(frame({'loan_term': 12.0}, {'loan_term': '12.0'}))
+    assert errors.isna().all()
+    assert cleaned_df['loan_term'].tolist() == [12, 12]
+
+def test_amount_at_float32_max_is_accepted():
+    _, errors = validate_loan_dataframe(frame({'income_annum': MAX_AMOUNT}))
+    assert errors.isna().all()
+
+def test_only_the_first_error_of_a_row_is_kept():
+    _, errors = validate_loan_dataframe(frame({'cibil_score': 'abc', 'income_annum': -1, 'education': 'x'}))
+    assert messages(errors) == ["Invalid value for cibil_score: must be an integer"]
+
+def test_csv_endpoint_marks_bad_rows(client):
+    sample = get_sample_data()
+    rows = [sample, {**sample, 'no_of_dependents': 2.5}, {**sample, 'income_annum': 1e40}]
+    csv = pd.DataFrame(rows).to_csv(index=False)
+    response = client.post("/api/v1/predict/csv", files={'file': ('loans.csv', csv)})
+    assert response.status_code == 200
+    results = pd.read_csv(io.StringIO(response.text))
+    assert results['prediction'].str.strip().tolist()[1:] == ['Error', 'Error']
+    assert results['prediction'].iloc[0].strip() in ('Approved', 'Rejected')
+    assert results['error'].tolist()[1:] == [
+        "Invalid value for no_of_dependents: must be an integer",
+        "Invalid value for income_annum: too large"
+    ]
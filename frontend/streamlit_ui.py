@@ -1,7 +1,10 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
+import numpy as np
 import json
+import orjson
 import plotly.graph_objects as go
 import plotly.express as px
 from io import StringIO
@@ -10,6 +13,37 @@ import base64
 # Configuration
 API_BASE_URL = "https://render-loansense.onrender.com/api/v1"
 
+# Default form values (same sample applicant as the API template)
+_DEFAULTS = {
+    'no_of_dependents': 2,
+    'income_annum': 8000000,
+    'loan_amount': 25000000,
+    'loan_term': 15,
+    'cibil_score': 750,
+    'residential_assets_value': 5000000,
+    'commercial_assets_value': 3000000,
+    'luxury_assets_value': 2000000,
+    'bank_asset_value': 1000000
+}
+
+# Columns of the batch input grid, with the same bounds as the single form
+_BATCH_COLUMN_CONFIG = {
+    'no_of_dependents': st.column_config.NumberColumn("Dependents", min_value=0, max_value=10, step=1, default=_DEFAULTS['no_of_dependents'], required=True),
+    'education': st.column_config.SelectboxColumn("Education", options=["Graduate", "Not Graduate"], default="Graduate", required=True),
+    'self_employed': st.column_config.SelectboxColumn("Self Employed", options=["Yes", "No"], default="Yes", required=True),
+    'income_annum': st.column_config.NumberColumn("Annual Income (₹)", min_value=0, step=1, default=_DEFAULTS['income_annum'], required=True),
+    'loan_amount': st.column_config.NumberColumn("Loan Amount (₹)", min_value=0, step=1, default=_DEFAULTS['loan_amount'], required=True),
+    'loan_term': st.column_config.NumberColumn("Loan Term (years)", min_value=1, max_value=30, step=1, default=_DEFAULTS['loan_term'], required=True),
+    'cibil_score': st.column_config.NumberColumn("CIBIL Score", min_value=300, max_value=900, step=1, default=_DEFAULTS['cibil_score'], required=True),
+    'residential_assets_value': st.column_config.NumberColumn("Residential Assets (₹)", min_value=0, step=1, default=_DEFAULTS['residential_assets_value'], required=True),
+    'commercial_assets_value': st.column_config.NumberColumn("Commercial Assets (₹)", min_value=0, step=1, default=_DEFAULTS['commercial_assets_value'], required=True),
+    'luxury_assets_value': st.column_config.NumberColumn("Luxury Assets (₹)", min_value=0, step=1, default=_DEFAULTS['luxury_assets_value'], required=True),
+    'bank_asset_value': st.column_config.NumberColumn("Bank Assets (₹)", min_value=0, step=1, default=_DEFAULTS['bank_asset_value'], required=True)
+}
+
+# Recommendation priority markers
+_PRIO = {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}
+
 # Page config
 st.set_page_config(
     page_title="Loan Prediction System",
@@ -55,25 +89,74 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Helper functions
-def call_api(endpoint, data=None, method="POST"):
-    """Make API calls to FastAPI backend"""
+@st.cache_resource
+def get_session():
+    """Shared HTTP session so API calls reuse pooled keep-alive connections"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def fetch_api(endpoint, data=None, method="POST"):
+    """Make API calls to FastAPI backend without touching the UI
+    
+    Returns a (result, error message) tuple.
+    """
     try:
         url = f"{API_BASE_URL}/{endpoint}"
         
         if method == "GET":
-            response = requests.get(url)
+            response = get_session().get(url, timeout=30)
         elif method == "POST":
-            response = requests.post(url, json=data)
+            response = get_session().post(
+                url,
+                data=orjson.dumps(data),
+                headers={"Content-Type": "application/json"},
+                timeout=30
+            )
         
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content), None
         else:
-            st.error(f"API Error: {response.status_code} - {response.text}")
-            return None
+            return None, f"API Error: {response.status_code} - {response.text}"
     except Exception as e:
-        st.error(f"Connection Error: {str(e)}")
+        return None, f"Connection Error: {str(e)}"
+
+def show_api_result(api_result):
+    """Report the error of a fetch_api result, if any, and return its payload"""
+    result, error = api_result
+    if error:
+        st.error(error)
+    return result
+
+def call_api(endpoint, data=None, method="POST"):
+    """Make API calls to FastAPI backend"""
+    return show_api_result(fetch_api(endpoint, data, method))
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _get_api_cached(endpoint):
+    """GET an endpoint; failures raise so that they are never cached"""
+    result, error = fetch_api(endpoint, method="GET")
+    if error:
+        raise RuntimeError(error)
+    return result
+
+def call_api_cached(endpoint):
+    """GET an API endpoint, reusing successful responses for 30 seconds"""
+    try:
+        return _get_api_cached(endpoint)
+    except RuntimeError as e:
+        st.error(str(e))
         return None
 
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_template_csv():
+    """Download the CSV template, reusing it for 30 seconds"""
+    response = get_session().get(f"{API_BASE_URL}/template", timeout=30)
+    response.raise_for_status()
+    return response.content
+
 def display_prediction(prediction_data):
     """Display prediction results"""
     # Handle both prediction and explanation response formats
@@ -98,24 +181,33 @@ def display_prediction(prediction_data):
         </div>
         """, unsafe_allow_html=True)
 
-def create_shap_plot(shap_values, feature_names):
-    """Create SHAP waterfall plot"""
-    # Sort by absolute SHAP value
-    sorted_items = sorted(shap_values.items(), key=lambda x: abs(x[1]), reverse=True)
+@st.cache_data(ttl=600, show_spinner=False)
+def create_shap_plot(shap_items, feature_names):
+    """Create SHAP waterfall plot
     
-    features = [item[0] for item in sorted_items]
-    values = [item[1] for item in sorted_items]
+    Takes hashable (feature, value) pairs so results are cached per explanation.
+    The figure is returned as a plain dict: st.plotly_chart accepts it, and it is
+    much cheaper to copy out of the cache than a plotly Figure.
+    """
+    shap_values = dict(shap_items)
+    # Sort by absolute SHAP value (stable, so ties keep their input order)
+    all_features = np.array(list(shap_values.keys()))
+    all_values = np.fromiter(shap_values.values(), dtype=np.float64, count=len(shap_values))
+    order = np.argsort(-np.abs(all_values), kind='stable')
+    
+    features = all_features[order]
+    values = all_values[order]
     
     # Create waterfall plot
     fig = go.Figure()
     
     # Use more vibrant colors that work well on dark backgrounds
-    colors = ['#ff6b6b' if v < 0 else '#51cf66' for v in values]
+    colors = np.where(values < 0, '#ff6b6b', '#51cf66')
     
     fig.add_trace(go.Bar(
-        x=features,
-        y=values,
-        marker_color=colors,
+        x=features.tolist(),
+        y=values.tolist(),
+        marker_color=colors.tolist(),
         name='SHAP Values'
     ))
     
@@ -129,21 +221,19 @@ def create_shap_plot(shap_values, feature_names):
         paper_bgcolor='rgba(0,0,0,0)'
     )
     
-    return fig
+    return fig.to_dict()
 
 def display_recommendations(recommendations):
     """Display recommendations"""
     st.subheader("💡 Recommendations for Improvement")
     
+    # Render all recommendation boxes in a single markdown element
+    html_parts = []
     for rec in recommendations:
         if rec.get('priority'):
-            priority_color = {
-                'High': '🔴',
-                'Medium': '🟡',
-                'Low': '🟢'
-            }.get(rec['priority'], '⚪')
+            priority_color = _PRIO.get(rec['priority'], '⚪')
             
-            st.markdown(f"""
+            html_parts.append(f"""
             <div class="recommendation-box">
                 <h4>{priority_color} {rec['priority']} Priority</h4>
                 <p><strong>Feature:</strong> {rec.get('feature', 'General')}</p>
@@ -151,7 +241,10 @@ def display_recommendations(recommendations):
                 {f"<p><strong>Current Value:</strong> {rec['current_value']}</p>" if 'current_value' in rec else ""}
                 <p><strong>Actionable:</strong> {'✅ Yes' if rec.get('actionable') else '❌ No'}</p>
             </div>
-            """, unsafe_allow_html=True)
+            """)
+    
+    if html_parts:
+        st.markdown("\n".join(html_parts), unsafe_allow_html=True)
 
 # Main app
 def main():
@@ -182,19 +275,19 @@ def single_prediction_page():
         col1, col2 = st.columns(2)
         
         with col1:
-            no_of_dependents = st.number_input("Number of Dependents", min_value=0, max_value=10, value=2)
+            no_of_dependents = st.number_input("Number of Dependents", min_value=0, max_value=10, value=_DEFAULTS['no_of_dependents'])
             education = st.selectbox("Education", ["Graduate", "Not Graduate"])
             self_employed = st.selectbox("Self Employed", ["Yes", "No"])
-            income_annum = st.number_input("Annual Income (₹)", min_value=0, value=8000000)
-            loan_amount = st.number_input("Loan Amount (₹)", min_value=0, value=25000000)
-            loan_term = st.number_input("Loan Term (years)", min_value=1, max_value=30, value=15)
+            income_annum = st.number_input("Annual Income (₹)", min_value=0, value=_DEFAULTS['income_annum'])
+            loan_amount = st.number_input("Loan Amount (₹)", min_value=0, value=_DEFAULTS['loan_amount'])
+            loan_term = st.number_input("Loan Term (years)", min_value=1, max_value=30, value=_DEFAULTS['loan_term'])
         
         with col2:
-            cibil_score = st.number_input("CIBIL Score", min_value=300, max_value=900, value=750)
-            residential_assets_value = st.number_input("Residential Assets Value (₹)", min_value=0, value=5000000)
-            commercial_assets_value = st.number_input("Commercial Assets Value (₹)", min_value=0, value=3000000)
-            luxury_assets_value = st.number_input("Luxury Assets Value (₹)", min_value=0, value=2000000)
-            bank_asset_value = st.number_input("Bank Asset Value (₹)", min_value=0, value=1000000)
+            cibil_score = st.number_input("CIBIL Score", min_value=300, max_value=900, value=_DEFAULTS['cibil_score'])
+            residential_assets_value = st.number_input("Residential Assets Value (₹)", min_value=0, value=_DEFAULTS['residential_assets_value'])
+            commercial_assets_value = st.number_input("Commercial Assets Value (₹)", min_value=0, value=_DEFAULTS['commercial_assets_value'])
+            luxury_assets_value = st.number_input("Luxury Assets Value (₹)", min_value=0, value=_DEFAULTS['luxury_assets_value'])
+            bank_asset_value = st.number_input("Bank Asset Value (₹)", min_value=0, value=_DEFAULTS['bank_asset_value'])
         
         submitted = st.form_submit_button("Submit Application")
     
@@ -214,27 +307,32 @@ def single_prediction_page():
             "bank_asset_value": bank_asset_value
         }
         
+        # One /full call predicts, explains and recommends from a single SHAP pass
+        results = call_api("full", loan_data)
+        if not results:
+            return
+        
         # Create tabs for different analyses
         tab1, tab2, tab3 = st.tabs(["Prediction", "Explanation", "Recommendations"])
         
         with tab1:
             st.subheader("🔮 Prediction Result")
-            prediction_result = call_api("predict", loan_data)
+            prediction_result = results["prediction"]
             
             if prediction_result:
                 display_prediction(prediction_result)
         
         with tab2:
             st.subheader("📊 SHAP Explanation")
-            explanation_result = call_api("explain", loan_data)
+            explanation_result = results["explanation"]
             
             if explanation_result:
                 display_prediction(explanation_result)
                 
                 # SHAP plot
                 shap_fig = create_shap_plot(
-                    explanation_result['shap_values'],
-                    list(explanation_result['shap_values'].keys())
+                    tuple(explanation_result['shap_values'].items()),
+                    tuple(explanation_result['shap_values'].keys())
                 )
                 st.plotly_chart(shap_fig, use_container_width=True)
                 
@@ -252,7 +350,7 @@ def single_prediction_page():
         
         with tab3:
             st.subheader("💡 Recommendations")
-            recommendation_result = call_api("recommend", loan_data)
+            recommendation_result = results["recommendations"]
             
             if recommendation_result:
                 current_prediction = recommendation_result.get('current_prediction', '').strip()
@@ -274,76 +372,66 @@ def batch_prediction_page():
     # Download template
     st.subheader("📥 Download Template")
     if st.button("Download CSV Template"):
-        template_response = requests.get(f"{API_BASE_URL}/template")
-        if template_response.status_code == 200:
+        try:
+            template_csv = fetch_template_csv()
+        except requests.RequestException as e:
+            st.error(f"Could not download template: {e}")
+        else:
             st.download_button(
                 label="Download Template CSV",
-                data=template_response.content,
+                data=template_csv,
                 file_name="loan_template.csv",
                 mime="text/csv"
             )
     
-    # Manual batch input
+    # Manual batch input: one editable grid instead of a widget per field
     st.subheader("✏️ Manual Batch Input")
-    num_applications = st.number_input("Number of Applications", min_value=1, max_value=10, value=2)
+    initial_df = pd.DataFrame([{
+        **_DEFAULTS,
+        'education': 'Graduate',
+        'self_employed': 'Yes'
+    }] * 2)[list(_BATCH_COLUMN_CONFIG)]
     
-    applications = []
-    for i in range(num_applications):
-        with st.expander(f"Application {i+1}"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                no_of_dependents = st.number_input(f"Number of Dependents {i+1}", min_value=0, max_value=10, value=2, key=f"deps_{i}")
-                education = st.selectbox(f"Education {i+1}", ["Graduate", "Not Graduate"], key=f"edu_{i}")
-                self_employed = st.selectbox(f"Self Employed {i+1}", ["Yes", "No"], key=f"emp_{i}")
-                income_annum = st.number_input(f"Annual Income {i+1} (₹)", min_value=0, value=8000000, key=f"income_{i}")
-                loan_amount = st.number_input(f"Loan Amount {i+1} (₹)", min_value=0, value=25000000, key=f"loan_{i}")
-                loan_term = st.number_input(f"Loan Term {i+1} (years)", min_value=1, max_value=30, value=15, key=f"term_{i}")
-            
-            with col2:
-                cibil_score = st.number_input(f"CIBIL Score {i+1}", min_value=300, max_value=900, value=750, key=f"cibil_{i}")
-                residential_assets_value = st.number_input(f"Residential Assets {i+1} (₹)", min_value=0, value=5000000, key=f"res_{i}")
-                commercial_assets_value = st.number_input(f"Commercial Assets {i+1} (₹)", min_value=0, value=3000000, key=f"com_{i}")
-                luxury_assets_value = st.number_input(f"Luxury Assets {i+1} (₹)", min_value=0, value=2000000, key=f"lux_{i}")
-                bank_asset_value = st.number_input(f"Bank Assets {i+1} (₹)", min_value=0, value=1000000, key=f"bank_{i}")
-            
-            applications.append({
-                "no_of_dependents": no_of_dependents,
-                "education": f" {education}",  # Add leading space
-                "self_employed": f" {self_employed}",  # Add leading space
-                "income_annum": income_annum,
-                "loan_amount": loan_amount,
-                "loan_term": loan_term,
-                "cibil_score": cibil_score,
-                "residential_assets_value": residential_assets_value,
-                "commercial_assets_value": commercial_assets_value,
-                "luxury_assets_value": luxury_assets_value,
-                "bank_asset_value": bank_asset_value
-            })
+    edited_df = st.data_editor(
+        initial_df,
+        num_rows="dynamic",
+        key="batch_editor",
+        hide_index=True,
+        use_container_width=True,
+        column_config=_BATCH_COLUMN_CONFIG
+    )
     
     if st.button("Process Batch Applications"):
-        batch_data = {"data": applications}
+        # Add the leading space the encoders expect
+        applications_df = edited_df.assign(
+            education=" " + edited_df['education'].str.strip(),
+            self_employed=" " + edited_df['self_employed'].str.strip()
+        )
+        batch_data = {"data": applications_df.to_dict(orient='records')}
         batch_result = call_api("predict/batch", batch_data)
         
         if batch_result:
             st.subheader("📊 Batch Results")
             
-            # Create results DataFrame
-            results_df = pd.DataFrame([
-                {
-                    "Application": i+1,
-                    "Prediction": pred.get('prediction', 'Unknown'),
-                    "Probability": f"{pred.get('probability', 0):.2%}",
-                    "Confidence": pred.get('confidence', 'Unknown')
-                }
-                for i, pred in enumerate(batch_result['predictions'])
-            ])
+            # Create results DataFrame column by column
+            predictions = batch_result['predictions']
+            results_df = pd.DataFrame({
+                "Application": range(1, len(predictions) + 1),
+                "Prediction": [pred.get('prediction', 'Unknown') for pred in predictions],
+                "Probability": [pred.get('probability', 0) for pred in predictions],
+                "Confidence": [pred.get('confidence', 'Unknown') for pred in predictions]
+            })
             
-            st.dataframe(results_df, use_container_width=True)
+            # Probabilities stay numeric; the table formats them as percentages
+            st.dataframe(
+                results_df,
+                use_container_width=True,
+                column_config={"Probability": st.column_config.NumberColumn(format="percent")}
+            )
             
             # Summary statistics
-            approved_count = sum(1 for pred in batch_result['predictions'] if pred.get('prediction', '').strip() == 'Approved')
-            st.metric("Approved Applications", f"{approved_count}/{len(batch_result['predictions'])}")
+            approved_count = int((results_df["Prediction"].astype(str).str.strip() == 'Approved').sum())
+            st.metric("Approved Applications", f"{approved_count}/{len(results_df)}")
 
 def csv_upload_page():
     """CSV upload page"""
@@ -352,15 +440,18 @@ def csv_upload_page():
     uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
     
     if uploaded_file is not None:
-        # Display file contents
-        df = pd.read_csv(uploaded_file)
+        # Display file contents; only the preview rows are parsed
+        df_preview = pd.read_csv(uploaded_file, nrows=5)
+        uploaded_file.seek(0)
         st.subheader("📄 File Preview")
-        st.dataframe(df.head(), use_container_width=True)
+        st.dataframe(df_preview, use_container_width=True)
         
         if st.button("Process CSV"):
-            # Send to API
-            files = {"file": uploaded_file.getvalue()}
-            response = requests.post(f"{API_BASE_URL}/predict/csv", files={"file": uploaded_file.getvalue()})
+            # Send the uploaded file object itself instead of copies of its bytes
+            response = get_session().post(
+                f"{API_BASE_URL}/predict/csv",
+                files={"file": (uploaded_file.name, uploaded_file, "text/csv")}
+            )
             
             if response.status_code == 200:
                 st.success("✅ CSV processed successfully!")
@@ -380,7 +471,7 @@ def api_status_page():
     st.header("🔧 API Status & Information")
     
     # Health check
-    health_status = call_api("health", method="GET")
+    health_status = call_api_cached("health")
     if health_status:
         st.success(f"✅ API Status: {health_status['status']}")
         st.info(f"Message: {health_status['message']}")
@@ -388,7 +479,7 @@ def api_status_page():
         st.error("❌ API is not responding")
     
     # Model information
-    model_info = call_api("models", method="GET")
+    model_info = call_api_cached("models")
     if model_info:
         st.subheader("🤖 Model Information")
         st.json(model_info)
@@ -5,11 +5,16 @@ Test script for Loan Prediction API
 
 import requests
 import json
+import orjson
 import sys
 
 # Configuration
 API_BASE_URL = "http://localhost:8000/api/v1"
 
+# Reuse one keep-alive connection for all test requests
+session = requests.Session()
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 # Test data
 sample_loan_data = {
     "no_of_dependents": 2,
@@ -28,7 +33,7 @@ sample_loan_data = {
 def test_health_check():
     """Test health check endpoint"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health")
+        response = session.get(f"{API_BASE_URL}/health")
         if response.status_code == 200:
             print("✅ Health check passed")
             return True
@@ -42,9 +47,9 @@ def test_health_check():
 def test_prediction():
     """Test prediction endpoint"""
     try:
-        response = requests.post(f"{API_BASE_URL}/predict", json=sample_loan_data)
+        response = session.post(f"{API_BASE_URL}/predict", data=orjson.dumps(sample_loan_data), headers=JSON_HEADERS)
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print(f"✅ Prediction test passed: {result['prediction']} ({result['probability']:.2%})")
             return True
         else:
@@ -57,9 +62,9 @@ def test_prediction():
 def test_explanation():
     """Test explanation endpoint"""
     try:
-        response = requests.post(f"{API_BASE_URL}/explain", json=sample_loan_data)
+        response = session.post(f"{API_BASE_URL}/explain", data=orjson.dumps(sample_loan_data), headers=JSON_HEADERS)
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print(f"✅ Explanation test passed: {len(result['shap_values'])} features explained")
             return True
         else:
@@ -72,9 +77,9 @@ def test_explanation():
 def test_recommendation():
     """Test recommendation endpoint"""
     try:
-        response = requests.post(f"{API_BASE_URL}/recommend", json=sample_loan_data)
+        response = session.post(f"{API_BASE_URL}/recommend", data=orjson.dumps(sample_loan_data), headers=JSON_HEADERS)
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print(f"✅ Recommendation test passed: {len(result['recommendations'])} recommendations")
             return True
         else:
@@ -87,9 +92,9 @@ def test_recommendation():
 def test_model_info():
     """Test model info endpoint"""
     try:
-        response = requests.get(f"{API_BASE_URL}/models")
+        response = session.get(f"{API_BASE_URL}/models")
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             print(f"✅ Model info test passed: {len(result['available_models'])} models available")
             return True
         else:
@@ -4,6 +4,11 @@ Test script to verify Streamlit format compatibility
 """
 
 import requests
+import orjson
+
+# Reuse one keep-alive connection for all test requests
+session = requests.Session()
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 def test_streamlit_format():
     """Test the format that Streamlit UI sends"""
@@ -33,10 +38,10 @@ def test_streamlit_format():
     
     for endpoint, description in endpoints:
         print(f"\n{description}...")
-        response = requests.post(f"http://localhost:8000/api/v1/{endpoint}", json=streamlit_data)
+        response = session.post(f"http://localhost:8000/api/v1/{endpoint}", data=orjson.dumps(streamlit_data), headers=JSON_HEADERS)
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             if endpoint == "predict":
                 print(f"   ✅ {result['prediction']} ({result['probability']:.1%})")
             elif endpoint == "explain":